@@ -1,6 +1,13 @@
 import numpy as np
 import global_hist_eq
 
+try:
+    from numba import njit, prange
+except ImportError:
+    # Numba is optional, adaptive histogram equalization falls back to NumPy
+    njit = None
+    prange = range
+
 
 def calculate_eq_transformations_of_regions(img_array: np.ndarray, region_len_h: int, region_len_w: int):
     """ Returns the histogram equalization transform of each contextual region
@@ -42,7 +49,122 @@ def calculate_eq_transformations_of_regions(img_array: np.ndarray, region_len_h:
     return region_to_eq_transform
 
 
-def perform_adaptive_hist_equalization(img_array: np.ndarray, region_len_h: int, region_len_w: int):
+def get_interpolation_axis(length: int, region_len: int):
+    """ Returns, for every pixel index along one image axis, the contextual
+        regions and the weight used by the bi-linear interpolation of
+        adaptive histogram equalization
+
+        :param length: number of pixels of the image along the axis
+        :type length: int
+        :param region_len: length (in number of pixels) of each contextual
+            region along the axis
+        :type region_len: int
+        :returns: index of the region each pixel resides in, indices of the
+            lower and upper adjacent regions, interpolation weight of the upper
+            region and a mask of the outer pixels
+        :rtype: Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray, numpy.ndarray, numpy.ndarray]
+    """
+
+    # pixel indices along the axis
+    idx = np.arange(length)
+
+    # number of contextual regions along the axis
+    num_regions = (length + region_len - 1) // region_len
+
+    # index of the contextual region each pixel resides in
+    own = idx // region_len
+
+    # contextual center of this region
+    center = own * region_len + region_len // 2
+
+    # pixels before the first contextual center and after the last one
+    # are outer points
+    outer = (own == 0) & (idx < center) | (own == num_regions - 1) & (idx > center)
+
+    # pixels at or after the contextual center are interpolated between their
+    # own region and the next one, all other pixels between the previous
+    # region and their own
+    lo = np.where(idx >= center, own, own - 1)
+    hi = lo + 1
+
+    # weight of the upper adjacent region, computed with respect to the
+    # center of the lower adjacent region
+    weight = (idx - (lo * region_len + region_len // 2)) / region_len
+
+    # pixels collinear with the last contextual center have no upper region;
+    # they take their level from their own region alone
+    last = hi > num_regions - 1
+    hi[last] = lo[last]
+
+    # outer points do not interpolate, keep indices inside the region grid
+    lo = np.clip(lo, 0, num_regions - 1)
+    hi = np.clip(hi, 0, num_regions - 1)
+
+    return own, lo, hi, weight, outer
+
+
+def _interpolate_regions(img_array, luts, row_own, row_lo, row_hi, row_w, row_outer,
+                         col_own, col_lo, col_hi, col_w, col_outer, equalized_img):
+    """ Fused per-pixel kernel of adaptive histogram equalization: finds the
+        contextual regions of each pixel, gathers the 4 transform values,
+        interpolates them and writes the rounded level into <equalized_img>
+    """
+
+    m, n = img_array.shape
+
+    # rows are independent of each other, so they are processed in parallel
+    for i in prange(m):
+        b = row_w[i]
+        for j in range(n):
+            level = img_array[i, j]
+            if row_outer[i] or col_outer[j]:
+                # pixel (i, j) is an outer point
+                equalized_img[i, j] = luts[row_own[i], col_own[j], level]
+            else:
+                # pixel (i, j) is an inner point or a contextual center
+                a = col_w[j]
+                equalized_img[i, j] = np.round(
+                        (1 - a) * (1 - b) * luts[row_lo[i], col_lo[j], level] +
+                        (1 - a) * b * luts[row_hi[i], col_lo[j], level] +
+                        a * (1 - b) * luts[row_lo[i], col_hi[j], level] +
+                        a * b * luts[row_hi[i], col_hi[j], level]
+                )
+
+
+if njit is not None:
+    # compile the kernel once and cache it on disk across runs
+    _interpolate_regions_jit = njit(parallel=True, cache=True)(_interpolate_regions)
+else:
+    _interpolate_regions_jit = None
+
+
+def _interpolate_regions_numpy(img_array, luts, row_own, row_lo, row_hi, row_w, row_outer,
+                               col_own, col_lo, col_hi, col_w, col_outer, equalized_img):
+    """ Vectorized NumPy equivalent of <_interpolate_regions>, used when Numba
+        is not available
+    """
+
+    # broadcast the per-row and per-column tables against each other
+    b = row_w[:, np.newaxis]
+    a = col_w[np.newaxis, :]
+    row_lo = row_lo[:, np.newaxis]
+    row_hi = row_hi[:, np.newaxis]
+
+    interpolated = np.round(
+            (1 - a) * (1 - b) * luts[row_lo, col_lo, img_array] +
+            (1 - a) * b * luts[row_hi, col_lo, img_array] +
+            a * (1 - b) * luts[row_lo, col_hi, img_array] +
+            a * b * luts[row_hi, col_hi, img_array]
+    )
+
+    outer = row_outer[:, np.newaxis] | col_outer[np.newaxis, :]
+    own = luts[row_own[:, np.newaxis], col_own, img_array]
+
+    equalized_img[...] = np.where(outer, own, interpolated)
+
+
+def perform_adaptive_hist_equalization(img_array: np.ndarray, region_len_h: int, region_len_w: int,
+                                       use_jit: bool = True, region_to_eq_transform: dict = None):
     """ Returns the adaptive histogram equalization transform of input image,
         using contextual regions with height <region_len_h> and width <region_len_w>
 
@@ -54,6 +176,13 @@ def perform_adaptive_hist_equalization(img_array: np.ndarray, region_len_h: int,
         :param region_len_w: width (in number of pixels) of each contextual
             region of image
         :type region_len_w: int
+        :param use_jit: use the Numba compiled kernel when Numba is installed,
+            otherwise fall back to NumPy
+        :type use_jit: bool
+        :param region_to_eq_transform: precomputed equalization transform of
+            each contextual region, as returned by
+            <calculate_eq_transformations_of_regions>; computed if not given
+        :type region_to_eq_transform: Dict[Tuple, numpy.ndarray]
         :returns: 8-bit grayscale output image of transform
         :rtype: numpy.ndarray(dtype= numpy.uint8)
     """
@@ -63,142 +192,33 @@ def perform_adaptive_hist_equalization(img_array: np.ndarray, region_len_h: int,
     n = img_array.shape[1]
 
     # initialize output image as a numpy ndarray
-    equalized_img = np.zeros((m, n))
+    equalized_img = np.empty((m, n), dtype=np.uint8)
 
     # compute histogram equalization transform for each contextual region
-    # of input image
-    region_to_eq_transform = calculate_eq_transformations_of_regions(img_array, region_len_h, region_len_w)
-
-    # set a list of contextual regions
-    regions = region_to_eq_transform.keys()
-
-    # find contextual centers of each region
-    # initialize a dictionary to hold key-value pairs {contextual region: contextual center}
-    region_to_center = {}
-    # iterate through all contextual regions of the input image
-    for region in regions:
-        # find center of contextual region
-        center = (region[0] + region_len_h // 2, region[1] + region_len_w // 2)
-        # update dictionary with the new key-value pair
-        region_to_center.update({region: center})
+    # of input image, unless it has already been computed
+    if region_to_eq_transform is None:
+        region_to_eq_transform = calculate_eq_transformations_of_regions(img_array, region_len_h, region_len_w)
 
-    # iterate through all image pixels
-    for i in range(m):
-        for j in range(n):
-            # find the contextual region each pixel resides in
-            region = ((i // region_len_h) * region_len_h, (j // region_len_w) * region_len_w)
-
-            # find the contextual center of this region
-            region_center = region_to_center[region]
-
-            # find the equalization transform of this contextual region
-            eq_transform = region_to_eq_transform[region]
+    # stack the transforms into a table indexed by
+    # (region row, region column, intensity level)
+    luts = np.array([[region_to_eq_transform[(i, j)] for j in range(0, n, region_len_w)]
+                     for i in range(0, m, region_len_h)], dtype=np.float64)
 
-            # check in which category the pixel falls in
-            if (i, j) == region_center:
-                # pixel (i, j) is a contextual center
-
-                # use the equalization transform of the contextual region
-                # that the pixel resides in
-                equalized_img[i, j] = eq_transform[img_array[i, j]]
-            elif region[0] == 0 and i < region_center[0] or \
-                    region[0] == m - region_len_h and i > region_center[0] or \
-                    region[1] == 0 and j < region_center[1] or \
-                    region[1] == n - region_len_w and j > region_center[1]:
-                # pixel (i, j) is an outer point
+    # the adjacent contextual regions and interpolation factors of a pixel
+    # depend only on its row (vertical) and its column (horizontal)
+    rows = get_interpolation_axis(m, region_len_h)
+    cols = get_interpolation_axis(n, region_len_w)
 
-                # use the equalization transform of the contextual region
-                # that the pixel resides in
-                equalized_img[i, j] = eq_transform[img_array[i, j]]
-            else:
-                # pixel (i, j) is an inner point
-
-                # use bi-linear interpolation between the equalization transforms
-                # of the 4 adjacent contextual regions
-
-                # find the 4 adjacent contextual centers depending on the relative position
-                # between the pixel (i, j) and the center of the contextual region it resides in
-
-                # initialize adjacent contextual centers with default value
-                h_minus = None
-                h_plus = None
-                w_minus = None
-                w_plus = None
-
-                if region[1] == n - region_len_w and j == region_center[1]:
-                    # pixels in the rightmost contextual regions, that are collinear
-                    # with their contextual centers
-                    if i > region_center[0]:
-                        h_minus = region_center[0]
-                        w_plus = region_center[1]
-                        h_plus = h_minus + region_len_h
-                        w_minus = w_plus - region_len_w
-                    elif i < region_center[0]:
-                        h_plus = region_center[0]
-                        w_plus = region_center[1]
-                        h_minus = h_plus - region_len_h
-                        w_minus = w_plus - region_len_w
-                elif region[0] == m - region_len_h and i == region_center[0]:
-                    # pixels in the lowermost contextual regions, that are collinear
-                    # with their contextual centers
-                    if j > region_center[1]:
-                        h_plus = region_center[0]
-                        w_minus = region_center[1]
-                        h_minus = h_plus - region_len_h
-                        w_plus = w_minus + region_len_w
-                    elif j < region_center[1]:
-                        h_plus = region_center[0]
-                        w_plus = region_center[1]
-                        h_minus = h_plus - region_len_h
-                        w_minus = w_plus - region_len_w
-                else:
-                    # all other pixels
-                    if i >= region_center[0] and j >= region_center[1]:
-                        h_minus = region_center[0]
-                        w_minus = region_center[1]
-                        h_plus = h_minus + region_len_h
-                        w_plus = w_minus + region_len_w
-
-                    if i >= region_center[0] and j < region_center[1]:
-                        h_minus = region_center[0]
-                        w_plus = region_center[1]
-                        h_plus = h_minus + region_len_h
-                        w_minus = w_plus - region_len_w
-
-                    if i < region_center[0] and j >= region_center[1]:
-                        h_plus = region_center[0]
-                        w_minus = region_center[1]
-                        h_minus = h_plus - region_len_h
-                        w_plus = w_minus + region_len_w
-
-                    if i < region_center[0] and j < region_center[1]:
-                        h_plus = region_center[0]
-                        w_plus = region_center[1]
-                        h_minus = h_plus - region_len_h
-                        w_minus = w_plus - region_len_w
-
-                # find corresponding adjacent contextual regions
-                region_minus_minus = (h_minus - region_len_h // 2, w_minus - region_len_w // 2)
-                region_minus_plus = (h_minus - region_len_h // 2, w_plus - region_len_w // 2)
-                region_plus_minus = (h_plus - region_len_h // 2, w_minus - region_len_w // 2)
-                region_plus_plus = (h_plus - region_len_h // 2, w_plus - region_len_w // 2)
-
-                # compute factors for bi-linear interpolation between transforms
-                a = (j - w_minus) / (w_plus - w_minus)
-                b = (i - h_minus) / (h_plus - h_minus)
-
-                # compute level of pixel (i, j) in the output image
-                equalized_img[i, j] = np.round(
-                        (1 - a) * (1 - b) * region_to_eq_transform[region_minus_minus][img_array[i, j]] +
-                        (1 - a) * b * region_to_eq_transform[region_plus_minus][img_array[i, j]] +
-                        a * (1 - b) * region_to_eq_transform[region_minus_plus][img_array[i, j]] +
-                        a * b * region_to_eq_transform[region_plus_plus][img_array[i, j]]
-                )
+    if use_jit and _interpolate_regions_jit is not None:
+        _interpolate_regions_jit(np.ascontiguousarray(img_array), luts, *rows, *cols, equalized_img)
+    else:
+        _interpolate_regions_numpy(img_array, luts, *rows, *cols, equalized_img)
 
     return equalized_img
 
 
-def perform_no_interpolation_ahe(img_array: np.ndarray, region_len_h: int, region_len_w: int):
+def perform_no_interpolation_ahe(img_array: np.ndarray, region_len_h: int, region_len_w: int,
+                                 region_to_eq_transform: dict = None):
     """ Returns the adaptive histogram equalization transform of input image,
         using contextual regions with height <region_len_h> and width <region_len_w>,
         without using bi-linear interpolation to compute values of each pixel in the
@@ -212,6 +232,10 @@ def perform_no_interpolation_ahe(img_array: np.ndarray, region_len_h: int, regio
         :param region_len_w: width (in number of pixels) of each contextual
             region of image
         :type region_len_w: int
+        :param region_to_eq_transform: precomputed equalization transform of
+            each contextual region, as returned by
+            <calculate_eq_transformations_of_regions>; computed if not given
+        :type region_to_eq_transform: Dict[Tuple, numpy.ndarray]
         :returns: 8-bit grayscale output image of transform
         :rtype: numpy.ndarray(dtype= numpy.uint8)
     """
@@ -224,8 +248,9 @@ def perform_no_interpolation_ahe(img_array: np.ndarray, region_len_h: int, regio
     equalized_img = np.zeros((m, n))
 
     # compute histogram equalization transform for each contextual region
-    # of input image
-    region_to_eq_transform = calculate_eq_transformations_of_regions(img_array, region_len_h, region_len_w)
+    # of input image, unless it has already been computed
+    if region_to_eq_transform is None:
+        region_to_eq_transform = calculate_eq_transformations_of_regions(img_array, region_len_h, region_len_w)
 
     for i in range(m):
         for j in range(n):
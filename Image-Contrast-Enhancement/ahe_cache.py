@@ -0,0 +1,144 @@
+import os
+import sys
+import numpy as np
+import global_hist_eq
+import adaptive_hist_eq
+
+# the cache core is shared with the other projects
+_SHARED = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Shared-Utilities")
+if _SHARED not in sys.path:
+    sys.path.append(_SHARED)
+
+from result_cache import ResultCache, hash_array
+
+# cache of final output images
+output_cache = ResultCache()
+
+# cache of intermediate equalization transforms of contextual regions,
+# shared between the adaptive histogram equalization variants
+transform_cache = ResultCache(max_entries=128)
+
+
+def configure_cache(max_entries: int = 32, max_memory_bytes: int = 1 << 30, cache_dir: str = None,
+                    max_disk_bytes: int = 1 << 30):
+    """ Replaces the caches used by the cached equalization functions, e.g. to
+        enable their on-disk tier
+
+        :param max_entries: maximum number of output images kept in memory
+        :type max_entries: int
+        :param max_memory_bytes: maximum size (in bytes) of the in-memory tier
+            of each cache
+        :type max_memory_bytes: int
+        :param cache_dir: directory of the on-disk tier, or None to keep
+            entries only in memory; output images and region transforms are
+            stored in separate subdirectories
+        :type cache_dir: str
+        :param max_disk_bytes: maximum size (in bytes) of the on-disk tier of
+            each cache
+        :type max_disk_bytes: int
+    """
+
+    global output_cache, transform_cache
+
+    output_dir = None if cache_dir is None else os.path.join(cache_dir, "ahe_outputs")
+    transform_dir = None if cache_dir is None else os.path.join(cache_dir, "ahe_transforms")
+
+    output_cache = ResultCache(max_entries, max_memory_bytes, output_dir, max_disk_bytes)
+    transform_cache = ResultCache(4 * max_entries, max_memory_bytes, transform_dir, max_disk_bytes)
+
+
+def cached_eq_transformations_of_regions(img_array: np.ndarray, region_len_h: int, region_len_w: int):
+    """ Cached version of <adaptive_hist_eq.calculate_eq_transformations_of_regions>
+
+        :param img_array: 8-bit grayscale input image
+        :type img_array: numpy.ndarray(dtype= numpy.uint8)
+        :param region_len_h: height (in number of pixels) of each contextual
+            region of image
+        :type region_len_h: int
+        :param region_len_w: width (in number of pixels) of each contextual
+            region of image
+        :type region_len_w: int
+        :returns: equalization transform of each contextual region
+        :rtype: Dict[Tuple, numpy.ndarray]
+    """
+
+    # the transforms are cached as a single table, with one row per contextual
+    # region in the order the regions are generated
+    regions = [(i, j) for i in range(0, img_array.shape[0], region_len_h)
+               for j in range(0, img_array.shape[1], region_len_w)]
+
+    key = hash_array(img_array, "regions", region_len_h, region_len_w)
+    transforms = transform_cache.get(key)
+    if transforms is None:
+        region_to_eq_transform = adaptive_hist_eq.calculate_eq_transformations_of_regions(
+            img_array, region_len_h, region_len_w)
+        transforms = transform_cache.put(key, np.array([region_to_eq_transform[region] for region in regions]))
+
+    return dict(zip(regions, transforms))
+
+
+def cached_global_hist_equalization(img_array: np.ndarray):
+    """ Cached version of <global_hist_eq.perform_global_hist_equalization>
+
+        :param img_array: 8-bit grayscale input image
+        :type img_array: numpy.ndarray(dtype= numpy.uint8)
+        :returns: equalized output image (read-only)
+        :rtype: numpy.ndarray(dtype= numpy.uint8)
+    """
+
+    key = hash_array(img_array, "global")
+    equalized_img = output_cache.get(key)
+    if equalized_img is None:
+        equalized_img = output_cache.put(key, global_hist_eq.perform_global_hist_equalization(img_array))
+
+    return equalized_img
+
+
+def cached_adaptive_hist_equalization(img_array: np.ndarray, region_len_h: int, region_len_w: int):
+    """ Cached version of <adaptive_hist_eq.perform_adaptive_hist_equalization>
+
+        :param img_array: 8-bit grayscale input image
+        :type img_array: numpy.ndarray(dtype= numpy.uint8)
+        :param region_len_h: height (in number of pixels) of each contextual
+            region of image
+        :type region_len_h: int
+        :param region_len_w: width (in number of pixels) of each contextual
+            region of image
+        :type region_len_w: int
+        :returns: 8-bit grayscale output image of transform (read-only)
+        :rtype: numpy.ndarray(dtype= numpy.uint8)
+    """
+
+    key = hash_array(img_array, "adaptive", region_len_h, region_len_w)
+    equalized_img = output_cache.get(key)
+    if equalized_img is None:
+        region_to_eq_transform = cached_eq_transformations_of_regions(img_array, region_len_h, region_len_w)
+        equalized_img = output_cache.put(key, adaptive_hist_eq.perform_adaptive_hist_equalization(
+            img_array, region_len_h, region_len_w, region_to_eq_transform=region_to_eq_transform))
+
+    return equalized_img
+
+
+def cached_no_interpolation_ahe(img_array: np.ndarray, region_len_h: int, region_len_w: int):
+    """ Cached version of <adaptive_hist_eq.perform_no_interpolation_ahe>
+
+        :param img_array: 8-bit grayscale input image
+        :type img_array: numpy.ndarray(dtype= numpy.uint8)
+        :param region_len_h: height (in number of pixels) of each contextual
+            region of image
+        :type region_len_h: int
+        :param region_len_w: width (in number of pixels) of each contextual
+            region of image
+        :type region_len_w: int
+        :returns: 8-bit grayscale output image of transform (read-only)
+        :rtype: numpy.ndarray(dtype= numpy.uint8)
+    """
+
+    key = hash_array(img_array, "no_interpolation", region_len_h, region_len_w)
+    equalized_img = output_cache.get(key)
+    if equalized_img is None:
+        region_to_eq_transform = cached_eq_transformations_of_regions(img_array, region_len_h, region_len_w)
+        equalized_img = output_cache.put(key, adaptive_hist_eq.perform_no_interpolation_ahe(
+            img_array, region_len_h, region_len_w, region_to_eq_transform=region_to_eq_transform))
+
+    return equalized_img
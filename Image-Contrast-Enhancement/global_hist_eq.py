@@ -58,3 +58,45 @@ def perform_global_hist_equalization(img_array: np.ndarray):
     equalized_img = np.array([equalization_transform[level] for level in img_array])
 
     return equalized_img
+
+
+def perform_stacked_global_hist_equalization(img_stack: np.ndarray):
+    """ Returns the output images of global histogram equalization transform
+        on a stack of 8-bit grayscale images, each equalized with its own
+        transform, in one vectorized pass over all images
+
+        :param img_stack: 8-bit grayscale input images, stacked along the
+            first axis
+        :type img_stack: numpy.ndarray(dtype= numpy.uint8)
+
+        :returns: equalized output images, identical to the outputs of
+            <perform_global_hist_equalization> on each input image
+        :rtype: numpy.ndarray(dtype= numpy.uint8)
+    """
+
+    # number of images and number of samples of each image
+    num_images = img_stack.shape[0]
+    n = img_stack[0].size
+
+    # compute the non-normalized histograms of all images with a single count,
+    # by shifting the levels of each image into its own range of bins
+    offsets = NUM_LEVELS * np.arange(num_images).reshape((-1,) + (1,) * (img_stack.ndim - 1))
+    histograms = np.bincount((img_stack + offsets).ravel(), minlength=num_images * NUM_LEVELS)
+    histograms = histograms.reshape(num_images, NUM_LEVELS)
+
+    # normalize histograms
+    histograms = np.divide(histograms, n)
+
+    # compute cumulative distribution functions of input images
+    # (summed the same way as in <get_equalization_transform_of_img>)
+    cdf = np.stack([np.sum(histograms[:, :(i+1)], axis=1) for i in range(NUM_LEVELS)], axis=1)
+    cdf0 = cdf[:, :1]
+
+    # compute equalization transforms of input images
+    equalization_transforms = np.round((cdf - cdf0)/(1 - cdf0)*(NUM_LEVELS-1))
+
+    # apply the equalization transform of each image to its levels
+    levels = img_stack.reshape(num_images, -1).astype(np.intp)
+    equalized_imgs = np.take_along_axis(equalization_transforms, levels, axis=1)
+
+    return equalized_imgs.reshape(img_stack.shape)
@@ -0,0 +1,85 @@
+import asyncio
+import io
+import json
+import os
+import numpy as np
+from PIL import Image
+from scipy.ndimage import convolve
+
+from image_service import ImageProcessingService
+import server
+import wiener_filtering
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+# LOAD IMAGE
+
+# set the filepath to the image file
+filename = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Wiener-filtering", "cameraman.tif")
+
+# obtain the underlying np array of the Luminance component of the image
+img_array = np.array(Image.open(fp=filename).convert("L"), dtype=np.uint8)
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+# DISTORTION AND NOISE SYSTEM MODEL
+
+# normalize intensity value to be in the range [0, 1]
+x = img_array.astype(np.float64) / 255
+
+# create a 5x5 box blur filter
+h = np.ones((5, 5)) / 25
+
+# fixed seed to generate the same random numbers across different runs
+np.random.seed(0)
+
+# generate several blurred and noisy images
+num_images = 32
+ys = [convolve(x, h, mode='wrap') + 0.05 * np.random.randn(*x.shape) for _ in range(num_images)]
+
+# set parameter k of the Wiener Filter
+k = 50.0
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+# SERVE REQUESTS ON LOCALHOST
+
+
+async def run():
+    async with ImageProcessingService(max_pending=16) as service:
+        http_server = await server.start_server(service, host="127.0.0.1", port=0)
+        port = http_server.sockets[0].getsockname()[1]
+        print("Serving on 127.0.0.1:{}".format(port))
+
+        # send concurrent Wiener filtering requests, which are micro-batched
+        # by the service since they share the same shape and kernel
+        bodies = []
+        for y in ys:
+            buffer = io.BytesIO()
+            np.savez(buffer, y=y, h=h, k=k)
+            bodies.append(buffer.getvalue())
+        responses = await asyncio.gather(*[server.request("POST", "/wiener", body, port=port) for body in bodies])
+
+        # requests rejected by backpressure are retried
+        for i, (status, body) in enumerate(responses):
+            while status == 503:
+                await asyncio.sleep(0.01)
+                status, body = await server.request("POST", "/wiener", bodies[i], port=port)
+            x_hat = np.load(io.BytesIO(body))
+            assert np.allclose(x_hat, wiener_filtering.my_wiener_filter(ys[i], h, k))
+
+        # equalize the original image through the asyncio API directly
+        equalized_img_array = await service.global_hist_equalization(img_array)
+        print("Equalized image range: ", equalized_img_array.min(), equalized_img_array.max())
+
+        # print queue latency metrics
+        status, body = await server.request("GET", "/metrics", port=port)
+        print(json.dumps(json.loads(body), indent=2))
+
+        http_server.close()
+        await http_server.wait_closed()
+
+
+asyncio.run(run())
+
+# ----------------------------------------------------------------------------------------------------------------------
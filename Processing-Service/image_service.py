@@ -0,0 +1,305 @@
+import asyncio
+import collections
+import concurrent.futures
+import hashlib
+import multiprocessing
+import os
+import sys
+import time
+import numpy as np
+
+# the service dispatches requests to the functions of the other projects,
+# which are standalone script directories
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for _project in ("Image-Contrast-Enhancement", "Wiener-filtering"):
+    _path = os.path.join(_ROOT, _project)
+    if _path not in sys.path:
+        sys.path.append(_path)
+
+import global_hist_eq
+import wiener_filtering
+
+# number of recent requests the latency metrics are computed on
+LATENCY_WINDOW = 1024
+
+# a queued request: the batch it can be grouped into, its input image,
+# the parameters of the operation, the future of its result and its
+# enqueue time
+_Request = collections.namedtuple("_Request", ["key", "image", "params", "future", "enqueued"])
+
+
+class ServiceBusyError(Exception):
+    """
+    Raised when a request is rejected because the queue of the service is full
+    """
+
+
+def _run_batch(operation: str, images: np.ndarray, params: tuple):
+    """
+    Runs an operation on a stack of images that share the same shape and parameters.
+    Executed in the worker threads or processes of the service.
+
+    :param operation: "global_hist_eq" or "wiener"
+    :param images: 3-dimensional array of images stacked along the first axis
+    :param params: parameters of the operation, (h, k) for the Wiener filter
+    :return: 3-dimensional array of the output images, in the order of the input images
+    """
+
+    if operation == "wiener":
+        # the whole stack is filtered with a single call, sharing the
+        # transfer function of the distortion system
+        h, k = params
+        return wiener_filtering.my_wiener_filter(images, h, k)
+
+    # the whole stack is equalized in one vectorized pass, each image with
+    # its own transform
+    return global_hist_eq.perform_stacked_global_hist_equalization(images)
+
+
+class ImageProcessingService:
+    """
+    Asyncio front-end to global histogram equalization and Wiener filtering.
+    Requests are queued, concurrent requests with the same operation, image shape and
+    parameters are micro-batched into one stacked call, and batches are run on a thread
+    or process pool, without blocking the event loop.
+
+    Backpressure: at most max_pending requests wait in the queue; further requests wait
+    for a free slot (or are rejected with ServiceBusyError when wait=False), and the queue
+    is drained no faster than max_workers batches at a time.
+    """
+
+    def __init__(self, max_workers: int = None, use_processes: bool = False, max_pending: int = 64,
+                 max_batch_size: int = 16, batch_window: float = 0.002):
+        """
+        :param max_workers: number of worker threads/ processes (default: number of CPUs)
+        :param use_processes: run batches on a process pool instead of a thread pool
+        :param max_pending: maximum number of requests waiting in the queue
+        :param max_batch_size: maximum number of requests in a batch
+        :param batch_window: time (in seconds) to wait for more requests to batch with
+                the first queued one
+        """
+
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.use_processes = use_processes
+        self.max_pending = max_pending
+        self.max_batch_size = max_batch_size
+        self.batch_window = batch_window
+
+        self._executor = None
+        self._queue = None
+        self._slots = None
+        self._dispatcher = None
+        self._running = set()
+
+        # metrics
+        self._queue_latencies = collections.deque(maxlen=LATENCY_WINDOW)
+        self._service_latencies = collections.deque(maxlen=LATENCY_WINDOW)
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._batches = 0
+
+    async def start(self):
+        """
+        Starts the worker pool and the dispatcher of the service
+        """
+
+        if self.use_processes:
+            # spawned workers do not inherit the sockets of the event loop, unlike
+            # forked ones (the calling script needs an if __name__ == "__main__" guard)
+            self._executor = concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn"))
+        else:
+            self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers)
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._slots = asyncio.Semaphore(self.max_workers)
+        self._dispatcher = asyncio.create_task(self._dispatch())
+
+    async def close(self):
+        """
+        Waits for all queued requests to be served, then stops the service
+        """
+
+        await self._queue.join()
+        if self._running:
+            await asyncio.gather(*self._running, return_exceptions=True)
+        self._dispatcher.cancel()
+        try:
+            await self._dispatcher
+        except asyncio.CancelledError:
+            pass
+        self._executor.shutdown()
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def global_hist_equalization(self, img_array: np.ndarray, wait: bool = True):
+        """
+        Asynchronous version of global_hist_eq.perform_global_hist_equalization
+
+        :param img_array: 8-bit grayscale input image
+        :param wait: wait for a free slot when the queue is full, instead of raising
+                ServiceBusyError
+        :return: equalized output image
+        """
+
+        img_array = np.asarray(img_array)
+        if img_array.ndim != 2 or img_array.dtype != np.uint8:
+            raise ValueError("expected a 2-dimensional 8-bit (uint8) image, got a {}-dimensional {} array"
+                             .format(img_array.ndim, img_array.dtype))
+
+        key = ("global_hist_eq", img_array.shape, img_array.dtype.str)
+        return await self._submit(key, img_array, (), wait)
+
+    async def wiener_filter(self, y: np.ndarray, h: np.ndarray, k: float, wait: bool = True):
+        """
+        Asynchronous version of wiener_filtering.my_wiener_filter
+
+        :param y: 2-dimensional array representing the distorted grayscale image in the spatial
+                field
+        :param h: 2-dimensional array representing the impulse response of the
+                distortion system
+        :param k: Wiener filter parameter
+        :param wait: wait for a free slot when the queue is full, instead of raising
+                ServiceBusyError
+        :return: 2-dimensional image of shape identical to the input image y, output of the
+        Wiener filter in the spatial field
+        """
+
+        y = np.asarray(y)
+        h = np.asarray(h)
+        if y.ndim != 2 or h.ndim != 2:
+            raise ValueError("expected 2-dimensional image y and impulse response h, got {} and {} dimensions"
+                             .format(y.ndim, h.ndim))
+        if not np.issubdtype(y.dtype, np.number) or not np.issubdtype(h.dtype, np.number):
+            raise ValueError("expected numeric image y and impulse response h")
+        if np.ndim(k) != 0:
+            raise ValueError("expected a scalar parameter k, got an array of shape {}".format(np.shape(k)))
+
+        h = np.ascontiguousarray(h, dtype=np.float64)
+        # requests are batched together only if they share the same kernel
+        kernel_id = hashlib.blake2b(h.tobytes() + str(h.shape).encode(), digest_size=16).hexdigest()
+        key = ("wiener", y.shape, y.dtype.str, kernel_id, float(k))
+        return await self._submit(key, y, (h, float(k)), wait)
+
+    def metrics(self):
+        """
+        Returns the queue and service metrics of the service. Latencies (in seconds) are
+        computed over the most recent LATENCY_WINDOW requests.
+
+        :return: dictionary of metric name to value
+        """
+
+        def summary(prefix, latencies):
+            latencies = np.array(latencies)
+            if latencies.size == 0:
+                return {prefix + "_mean": 0.0, prefix + "_p50": 0.0, prefix + "_p95": 0.0, prefix + "_max": 0.0}
+            return {
+                prefix + "_mean": float(np.mean(latencies)),
+                prefix + "_p50": float(np.percentile(latencies, 50)),
+                prefix + "_p95": float(np.percentile(latencies, 95)),
+                prefix + "_max": float(np.max(latencies)),
+            }
+
+        metrics = {
+            "pending": self._queue.qsize() if self._queue is not None else 0,
+            "completed": self._completed,
+            "failed": self._failed,
+            "rejected": self._rejected,
+            "batches": self._batches,
+            "mean_batch_size": (self._completed + self._failed) / self._batches if self._batches else 0.0,
+        }
+        metrics.update(summary("queue_latency", self._queue_latencies))
+        metrics.update(summary("service_latency", self._service_latencies))
+
+        return metrics
+
+    async def _submit(self, key: tuple, image: np.ndarray, params: tuple, wait: bool):
+        if self._dispatcher is None:
+            raise RuntimeError("service is not started")
+
+        request = _Request(key, image, params, asyncio.get_running_loop().create_future(), time.perf_counter())
+        if wait:
+            await self._queue.put(request)
+        else:
+            try:
+                self._queue.put_nowait(request)
+            except asyncio.QueueFull:
+                self._rejected += 1
+                raise ServiceBusyError("queue of {} pending requests is full".format(self.max_pending))
+
+        return await request.future
+
+    async def _dispatch(self):
+        loop = asyncio.get_running_loop()
+
+        while True:
+            # wait for a free worker before draining the queue, so that the
+            # queue fills up and applies backpressure when workers are busy
+            await self._slots.acquire()
+            try:
+                requests = [await self._queue.get()]
+            except asyncio.CancelledError:
+                self._slots.release()
+                raise
+
+            # collect the requests that arrive within the batching window
+            deadline = loop.time() + self.batch_window
+            while len(requests) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                try:
+                    if timeout > 0:
+                        requests.append(await asyncio.wait_for(self._queue.get(), timeout))
+                    else:
+                        requests.append(self._queue.get_nowait())
+                except (asyncio.TimeoutError, asyncio.QueueEmpty):
+                    break
+
+            # group requests that can share one stacked call
+            batches = collections.defaultdict(list)
+            for request in requests:
+                batches[request.key].append(request)
+
+            for i, batch in enumerate(batches.values()):
+                # the first batch uses the slot acquired above
+                if i > 0:
+                    await self._slots.acquire()
+                task = asyncio.create_task(self._run(batch))
+                self._running.add(task)
+                task.add_done_callback(self._running.discard)
+
+    async def _run(self, batch: list):
+        loop = asyncio.get_running_loop()
+
+        try:
+            dispatched = time.perf_counter()
+            for request in batch:
+                self._queue_latencies.append(dispatched - request.enqueued)
+
+            operation = batch[0].key[0]
+            images = np.stack([request.image for request in batch])
+            outputs = await loop.run_in_executor(self._executor, _run_batch, operation, images, batch[0].params)
+
+            self._completed += len(batch)
+            for request, output in zip(batch, outputs):
+                if not request.future.done():
+                    request.future.set_result(output)
+        except Exception as e:
+            # any failure of the batch, e.g. running out of memory while stacking
+            # its images, is reported to every request, so that no client waits forever
+            self._failed += len(batch)
+            for request in batch:
+                if not request.future.done():
+                    request.future.set_exception(e)
+        finally:
+            finished = time.perf_counter()
+            for request in batch:
+                self._service_latencies.append(finished - request.enqueued)
+            self._batches += 1
+            self._slots.release()
+            for _ in batch:
+                self._queue.task_done()
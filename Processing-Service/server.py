@@ -0,0 +1,171 @@
+import argparse
+import asyncio
+import io
+import json
+import numpy as np
+
+from image_service import ImageProcessingService, ServiceBusyError
+
+# endpoints of the server:
+#   POST /global_hist_eq  body: .npy of the input image,            response: .npy of the output image
+#   POST /wiener          body: .npz with arrays "y", "h" and "k",  response: .npy of the output image
+#   GET  /metrics         response: JSON of the service metrics
+
+# maximum accepted size (in bytes) of a request body
+MAX_BODY_SIZE = 1 << 30
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 413: "Payload Too Large",
+            500: "Internal Server Error", 503: "Service Unavailable"}
+
+
+def _to_npy(array: np.ndarray):
+    buffer = io.BytesIO()
+    np.save(buffer, array, allow_pickle=False)
+    return buffer.getvalue()
+
+
+async def _route(service: ImageProcessingService, method: str, path: str, body: bytes):
+    """
+    Serves a single request and returns its status code, content type and body
+    """
+
+    if method == "GET" and path == "/metrics":
+        return 200, "application/json", json.dumps(service.metrics()).encode()
+
+    if method == "POST" and path == "/global_hist_eq":
+        img_array = np.load(io.BytesIO(body), allow_pickle=False)
+        # the service validates the image and raises ValueError on invalid input
+        output = await service.global_hist_equalization(img_array, wait=False)
+        return 200, "application/octet-stream", _to_npy(output)
+
+    if method == "POST" and path == "/wiener":
+        with np.load(io.BytesIO(body), allow_pickle=False) as arrays:
+            y, h, k = arrays["y"], arrays["h"], arrays["k"]
+        # the service validates the arrays and raises ValueError on invalid input
+        output = await service.wiener_filter(y, h, k, wait=False)
+        return 200, "application/octet-stream", _to_npy(output)
+
+    return 404, "text/plain", b"unknown endpoint"
+
+
+async def _handle_connection(service: ImageProcessingService, reader: asyncio.StreamReader,
+                             writer: asyncio.StreamWriter):
+    """
+    Handles one HTTP/1.1 request per connection
+    """
+
+    try:
+        request_line = (await reader.readline()).decode("latin-1").split()
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode("latin-1").strip()
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        if len(request_line) < 2:
+            status, content_type, body = 400, "text/plain", b"malformed request"
+        else:
+            try:
+                length = int(headers.get("content-length", 0))
+            except ValueError:
+                length = -1
+
+            if length < 0:
+                status, content_type, body = 400, "text/plain", b"invalid Content-Length header"
+            elif length > MAX_BODY_SIZE:
+                status, content_type, body = 413, "text/plain", b"request body too large"
+            else:
+                try:
+                    body = await reader.readexactly(length)
+                    status, content_type, body = await _route(service, request_line[0], request_line[1], body)
+                except ServiceBusyError as e:
+                    # backpressure: the client should retry later
+                    status, content_type, body = 503, "text/plain", str(e).encode()
+                except (ValueError, KeyError, OSError) as e:
+                    status, content_type, body = 400, "text/plain", str(e).encode()
+                except Exception as e:
+                    status, content_type, body = 500, "text/plain", str(e).encode()
+
+        writer.write("HTTP/1.1 {} {}\r\nContent-Type: {}\r\nContent-Length: {}\r\nConnection: close\r\n\r\n"
+                     .format(status, _REASONS[status], content_type, len(body)).encode("latin-1"))
+        writer.write(body)
+        await writer.drain()
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def start_server(service: ImageProcessingService, host: str = "127.0.0.1", port: int = 0,
+                       path: str = None):
+    """
+    Starts serving the service over HTTP, on a local TCP port or on a Unix socket
+
+    :param service: started image processing service
+    :param host: address to listen on (ignored if path is given)
+    :param port: TCP port to listen on, 0 to pick a free one (ignored if path is given)
+    :param path: filepath of the Unix socket to listen on
+    :return: asyncio.Server instance
+    """
+
+    def handler(reader, writer):
+        return _handle_connection(service, reader, writer)
+
+    if path is not None:
+        return await asyncio.start_unix_server(handler, path=path)
+
+    return await asyncio.start_server(handler, host=host, port=port)
+
+
+async def request(method: str, endpoint: str, body: bytes = b"", host: str = "127.0.0.1", port: int = None,
+                  path: str = None):
+    """
+    Sends a request to the server and returns its status code and body
+
+    :param method: "GET" or "POST"
+    :param endpoint: endpoint of the server, e.g. "/wiener"
+    :param body: body of the request
+    :param host: address of the server (ignored if path is given)
+    :param port: TCP port of the server (ignored if path is given)
+    :param path: filepath of the Unix socket of the server
+    :return: tuple of the status code (int) and body (bytes) of the response
+    """
+
+    if path is not None:
+        reader, writer = await asyncio.open_unix_connection(path)
+    else:
+        reader, writer = await asyncio.open_connection(host, port)
+
+    writer.write("{} {} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {}\r\nConnection: close\r\n\r\n"
+                 .format(method, endpoint, len(body)).encode("latin-1"))
+    writer.write(body)
+    await writer.drain()
+
+    response = await reader.read()
+    writer.close()
+
+    head, _, response_body = response.partition(b"\r\n\r\n")
+    status = int(head.split()[1])
+
+    return status, response_body
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Serve histogram equalization and Wiener filtering")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--unix-socket", default=None, help="listen on a Unix socket instead of TCP")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--processes", action="store_true", help="use a process pool instead of threads")
+    args = parser.parse_args()
+
+    async with ImageProcessingService(max_workers=args.workers, use_processes=args.processes) as service:
+        server = await start_server(service, args.host, args.port, args.unix_socket)
+        async with server:
+            await server.serve_forever()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
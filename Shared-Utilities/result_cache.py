@@ -0,0 +1,176 @@
+import collections
+import hashlib
+import os
+import tempfile
+import threading
+import numpy as np
+
+
+def hash_array(array: np.ndarray, *params):
+    """
+    Returns a content-addressed key for an input array and the parameters of the
+    computation performed on it.
+
+    :param array: input array
+    :param params: parameters of the computation (hashed by their repr)
+    :return: hexadecimal digest (str) of the array contents, shape, dtype and parameters
+    """
+
+    digest = hashlib.blake2b(digest_size=16)
+
+    # arrays with identical bytes but different shape or type
+    # must not share a key
+    digest.update(str(array.dtype).encode())
+    digest.update(str(array.shape).encode())
+    digest.update(repr(params).encode())
+
+    # hash the underlying buffer as bytes, without copying it unless it is not
+    # contiguous (a byte view, unlike a memoryview cast, also handles empty arrays)
+    digest.update(np.ascontiguousarray(array).reshape(-1).view(np.uint8))
+
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """
+    Two-tier cache of numpy arrays: an in-memory LRU tier holding at most max_entries
+    arrays and max_memory_bytes bytes, and an optional on-disk tier of .npy files in
+    cache_dir, holding at most max_disk_bytes bytes.
+    Cached arrays are returned read-only, since they are shared between callers.
+    """
+
+    def __init__(self, max_entries: int = 32, max_memory_bytes: int = 1 << 30, cache_dir: str = None,
+                 max_disk_bytes: int = 1 << 30):
+        self.max_entries = max_entries
+        self.max_memory_bytes = max_memory_bytes
+        self.cache_dir = cache_dir
+        self.max_disk_bytes = max_disk_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = collections.OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, key: str):
+        return os.path.join(self.cache_dir, key + ".npy")
+
+    def get(self, key: str):
+        """
+        Returns the array cached under key, or None if there is none
+        """
+
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                # mark the entry as the most recently used one
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+
+        if self.cache_dir is not None:
+            path = self._path(key)
+            try:
+                value = np.load(path)
+                # refresh the modification time, which orders disk eviction
+                os.utime(path)
+            except (OSError, ValueError):
+                value = None
+            if value is not None:
+                # the loaded array is not shared with anyone, no need to copy it
+                value = self._put_memory(key, value, copy=False)
+                with self._lock:
+                    self.hits += 1
+                return value
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, value: np.ndarray):
+        """
+        Caches array value under key and returns the cached, read-only array
+        """
+
+        value = self._put_memory(key, value)
+        if self.cache_dir is not None:
+            self._put_disk(key, value)
+
+        return value
+
+    def clear(self):
+        """
+        Removes all entries from both tiers of the cache
+        """
+
+        with self._lock:
+            self._entries.clear()
+            self._memory_bytes = 0
+        if self.cache_dir is not None:
+            for filename in os.listdir(self.cache_dir):
+                if filename.endswith(".npy"):
+                    try:
+                        os.remove(os.path.join(self.cache_dir, filename))
+                    except FileNotFoundError:
+                        # removed by another writer
+                        pass
+
+    def _put_memory(self, key: str, value: np.ndarray, copy: bool = True):
+        # cache a private copy, so that neither the caller's array becomes
+        # read-only nor the cached data can be changed through it
+        value = np.array(value, copy=copy)
+        value.setflags(write=False)
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._memory_bytes -= previous.nbytes
+            self._entries[key] = value
+            self._memory_bytes += value.nbytes
+            # evict the least recently used entries until the tier fits its bounds
+            while self._entries and (len(self._entries) > self.max_entries or
+                                     self._memory_bytes > self.max_memory_bytes):
+                _, evicted = self._entries.popitem(last=False)
+                self._memory_bytes -= evicted.nbytes
+
+        return value
+
+    def _put_disk(self, key: str, value: np.ndarray):
+        path = self._path(key)
+
+        # write to a temporary file with a unique name first, so that concurrent
+        # readers never see a partially written array and concurrent writers
+        # (threads or processes) never share a temporary file
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.save(f, value)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+
+        # evict the least recently used files until the tier fits its size bound
+        files = []
+        for filename in os.listdir(self.cache_dir):
+            if filename.endswith(".npy"):
+                try:
+                    stat = os.stat(os.path.join(self.cache_dir, filename))
+                except FileNotFoundError:
+                    # evicted by another writer
+                    continue
+                files.append((stat.st_mtime, stat.st_size, filename))
+        total_bytes = sum(size for _, size, _ in files)
+        for _, size, filename in sorted(files):
+            if total_bytes <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.cache_dir, filename))
+            except FileNotFoundError:
+                pass
+            total_bytes -= size
@@ -7,6 +7,7 @@ import numpy as np
 import inverse_filtering
 import wiener_filtering
 import optimal_wiener_parameter
+import quality_metrics
 
 # ----------------------------------------------------------------------------------------------------------------------
 
@@ -93,6 +94,18 @@ x_hat = wiener_filtering.my_wiener_filter(y, h, k)
 
 # ----------------------------------------------------------------------------------------------------------------------
 
+# QUALITY METRICS
+
+# the outputs of the filters are shifted compared to the original image x, so
+# they are compared to the output of inverse filtering on the noiseless image y0,
+# as in the calculation of the optimal parameter k
+for name, x_est in [("Inverse filtering x_inv", x_inv), ("Wiener filtering x_hat", x_hat)]:
+    print("{}: MSE = {:.4f}, PSNR = {:.2f} dB, SSIM = {:.4f}".format(
+        name, quality_metrics.mse(x_inv0, x_est), quality_metrics.psnr(x_inv0, x_est),
+        quality_metrics.ssim(x_inv0, x_est)))
+
+# ----------------------------------------------------------------------------------------------------------------------
+
 # PLOT PROCESSING RESULTS
 
 fig, axs = plt.subplots(nrows=2, ncols=3)
@@ -1,6 +1,7 @@
 import numpy as np
 import inverse_filtering
 import wiener_filtering
+import quality_metrics
 from scipy.ndimage import convolve
 import matplotlib.pyplot as plt
 
@@ -49,13 +50,24 @@ def calculate_k(x_inv0: np.ndarray, y: np.ndarray, h: np.ndarray, power_x: float
     # initialize mse
     mse = np.zeros((num, ))
 
-    for i in range(num):
-        k = k_values[i]
-        # apply Wiener filter on the distorted/ noisy image y
-        x_hat = wiener_filtering.my_wiener_filter(y, h, k)
+    # the mse is computed in the spatial frequency field, where applying the
+    # Wiener filter is an element-wise product: the Discrete Fourier Transforms
+    # of x_inv0, y and h are computed only once, instead of once per value of k
+    x_inv0_dft = np.fft.fft2(x_inv0)
+    y_dft = np.fft.fft2(y)
+    h_dft = wiener_filtering.get_kernel_spectrum(h, y.shape)
+
+    # number of values of k evaluated at a time
+    # (bounds the size of the temporaries)
+    chunk = 16
+
+    for i in range(0, num, chunk):
+        k = k_values[i:(i + chunk), np.newaxis, np.newaxis]
+        # apply Wiener filter on the distorted/ noisy image y, in the spatial frequency field
+        x_hat_dft = np.multiply(wiener_filtering.get_wiener_transfer_function(h_dft, k), y_dft)
 
         # compute the mse for every value of k
-        mse[i] = np.mean((x_inv0 - x_hat)**2)
+        mse[i:(i + chunk)] = quality_metrics.spectral_mse(x_inv0_dft, x_hat_dft)
 
     # after having computed the MSE for a set of values of parameter k,
     # we need to find which value of k minimizes it
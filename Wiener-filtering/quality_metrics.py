@@ -0,0 +1,156 @@
+import numpy as np
+
+# constants of the Structural Similarity index, relative to the dynamic range of the images
+SSIM_K1 = 0.01
+SSIM_K2 = 0.03
+
+
+def mse(x: np.ndarray, x_hat: np.ndarray):
+    """
+    Returns the Mean Squared Error between a reference image x and an estimated image x_hat.
+    Stacks of images are compared image by image, over the last two axes.
+
+    :param x: 2-dimensional array representing the reference image in the spatial field
+    :param x_hat: 2-dimensional array representing the estimated image in the spatial
+            field, or array of such images stacked along the first axes
+    :return: Mean Squared Error (float), or array of one Mean Squared Error per stacked image
+    """
+
+    return np.mean((x - x_hat)**2, axis=(-2, -1))
+
+
+def spectral_mse(x_dft: np.ndarray, x_hat_dft: np.ndarray):
+    """
+    Returns the Mean Squared Error between a reference image x and an estimated image x_hat,
+    computed directly from their Discrete Fourier Transforms (as returned by numpy.fft.fft2),
+    so that estimations produced in the spatial frequency field need no Inverse Discrete
+    Fourier Transform.
+    By Parseval's theorem, the sum of squared errors in the spatial field equals the sum of
+    squared errors in the spatial frequency field, divided by the number of samples m*n.
+
+    :param x_dft: 2-dimensional complex array, Discrete Fourier Transform of the reference image
+    :param x_hat_dft: 2-dimensional complex array, Discrete Fourier Transform of the estimated
+            image, or array of such transforms stacked along the first axes
+    :return: Mean Squared Error (float), or array of one Mean Squared Error per stacked image
+    """
+
+    # number of samples of each image
+    num_samples = x_dft.shape[-2] * x_dft.shape[-1]
+
+    # squared magnitude of the error, without forming a complex temporary
+    # for its absolute value
+    error = x_dft - x_hat_dft
+    error_magn2 = error.real**2 + error.imag**2
+
+    return np.sum(error_magn2, axis=(-2, -1)) / num_samples**2
+
+
+def psnr(x: np.ndarray, x_hat: np.ndarray, data_range: float = 1.0):
+    """
+    Returns the Peak Signal-to-Noise Ratio (in dB) of an estimated image x_hat with respect
+    to a reference image x.
+
+    :param x: 2-dimensional array representing the reference image in the spatial field
+    :param x_hat: 2-dimensional array representing the estimated image in the spatial
+            field, or array of such images stacked along the first axes
+    :param data_range: dynamic range of the images (1 for images normalized in [0, 1],
+            255 for 8-bit images)
+    :return: Peak Signal-to-Noise Ratio (float), or array of one Peak Signal-to-Noise Ratio per
+    stacked image; infinite for identical images
+    """
+
+    with np.errstate(divide="ignore"):
+        return 10 * np.log10(data_range**2 / mse(x, x_hat))
+
+
+def _window_sums(a: np.ndarray, win_size: int):
+    """
+    Returns the sums of a over all win_size x win_size windows that lie entirely inside
+    the image, computed in constant time per window using the integral image of a
+    """
+
+    # integral image of a, with a leading row and column of zeros
+    integral = np.zeros(a.shape[:-2] + (a.shape[-2] + 1, a.shape[-1] + 1))
+    np.cumsum(a, axis=-2, out=integral[..., 1:, 1:])
+    np.cumsum(integral[..., 1:, 1:], axis=-1, out=integral[..., 1:, 1:])
+
+    w = win_size
+    return integral[..., w:, w:] - integral[..., :-w, w:] - integral[..., w:, :-w] + integral[..., :-w, :-w]
+
+
+def _ssim_sum(x: np.ndarray, x_hat: np.ndarray, data_range: float, win_size: int):
+    """
+    Returns the sum of the Structural Similarity index map of x_hat with respect to x,
+    over all windows that lie entirely inside the images
+    """
+
+    # number of samples of each window
+    num_samples = win_size**2
+
+    # local means
+    mu_x = _window_sums(x, win_size) / num_samples
+    mu_y = _window_sums(x_hat, win_size) / num_samples
+
+    # local (sample) variances and covariance
+    cov_norm = num_samples / (num_samples - 1)
+    var_x = cov_norm * (_window_sums(x * x, win_size) / num_samples - mu_x**2)
+    var_y = cov_norm * (_window_sums(x_hat * x_hat, win_size) / num_samples - mu_y**2)
+    cov_xy = cov_norm * (_window_sums(x * x_hat, win_size) / num_samples - mu_x * mu_y)
+
+    c1 = (SSIM_K1 * data_range)**2
+    c2 = (SSIM_K2 * data_range)**2
+
+    ssim_map = ((2 * mu_x * mu_y + c1) * (2 * cov_xy + c2)) / \
+               ((mu_x**2 + mu_y**2 + c1) * (var_x + var_y + c2))
+
+    return np.sum(ssim_map, axis=(-2, -1))
+
+
+def ssim(x: np.ndarray, x_hat: np.ndarray, data_range: float = 1.0, win_size: int = 7, band_rows: int = None):
+    """
+    Returns the mean Structural Similarity index of an estimated image x_hat with respect to
+    a reference image x, using win_size x win_size uniform windows that lie entirely inside
+    the images.
+    Local statistics are computed with integral images. For large images, the index can be
+    evaluated in horizontal bands of band_rows window positions at a time, which bounds the
+    size of the temporaries without changing the result.
+
+    :param x: 2-dimensional array representing the reference image in the spatial field
+    :param x_hat: 2-dimensional array representing the estimated image in the spatial
+            field, or array of such images stacked along the first axes
+    :param data_range: dynamic range of the images (1 for images normalized in [0, 1],
+            255 for 8-bit images)
+    :param win_size: side (in number of pixels) of the windows, at least 2
+    :param band_rows: number of rows of window positions evaluated at a time (default: all)
+    :return: Structural Similarity index (float), or array of one Structural Similarity index
+    per stacked image
+    """
+
+    x = np.asarray(x, dtype=np.float64)
+    x_hat = np.asarray(x_hat, dtype=np.float64)
+
+    if win_size < 2:
+        raise ValueError("window size must be at least 2 to compute local variances, got {}".format(win_size))
+    if band_rows is not None and band_rows < 1:
+        raise ValueError("number of rows of each band must be positive, got {}".format(band_rows))
+
+    # image shape
+    m, n = x.shape[-2:]
+    if m < win_size or n < win_size:
+        raise ValueError("images of shape {} are smaller than the {}x{} window".format((m, n), win_size, win_size))
+
+    # number of window positions along each axis
+    rows = m - win_size + 1
+    cols = n - win_size + 1
+
+    if band_rows is None:
+        band_rows = rows
+
+    # consecutive bands overlap by win_size - 1 image rows, so that every window
+    # position is evaluated exactly once
+    total = 0
+    for start in range(0, rows, band_rows):
+        stop = min(start + band_rows, rows) + win_size - 1
+        total = total + _ssim_sum(x[..., start:stop, :], x_hat[..., start:stop, :], data_range, win_size)
+
+    return total / (rows * cols)
@@ -0,0 +1,81 @@
+import os
+import sys
+import numpy as np
+import wiener_filtering
+
+# the cache core is shared with the other projects
+_SHARED = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Shared-Utilities")
+if _SHARED not in sys.path:
+    sys.path.append(_SHARED)
+
+from result_cache import ResultCache, hash_array
+
+# cache of final output images
+output_cache = ResultCache()
+
+# cache of intermediate transfer functions of distortion systems
+spectrum_cache = ResultCache(max_entries=16)
+
+
+def configure_cache(max_entries: int = 32, max_memory_bytes: int = 1 << 30, cache_dir: str = None,
+                    max_disk_bytes: int = 1 << 30):
+    """
+    Replaces the caches used by the cached Wiener filtering functions, e.g. to enable their
+    on-disk tier
+
+    :param max_entries: maximum number of output images kept in memory
+    :param max_memory_bytes: maximum size (in bytes) of the in-memory tier of each cache
+    :param cache_dir: directory of the on-disk tier, or None to keep entries only in memory;
+            output images and transfer functions are stored in separate subdirectories
+    :param max_disk_bytes: maximum size (in bytes) of the on-disk tier of each cache
+    """
+
+    global output_cache, spectrum_cache
+
+    output_dir = None if cache_dir is None else os.path.join(cache_dir, "wiener_outputs")
+    spectrum_dir = None if cache_dir is None else os.path.join(cache_dir, "wiener_spectra")
+
+    output_cache = ResultCache(max_entries, max_memory_bytes, output_dir, max_disk_bytes)
+    spectrum_cache = ResultCache(max(1, max_entries // 2), max_memory_bytes, spectrum_dir, max_disk_bytes)
+
+
+def cached_kernel_spectrum(h: np.ndarray, shape: tuple):
+    """
+    Cached version of wiener_filtering.get_kernel_spectrum
+
+    :param h: 2-dimensional array representing the impulse response of the
+            distortion system
+    :param shape: shape (m, n) of the image the distortion system is applied on
+    :return: 2-dimensional complex array of shape <shape> (read-only), transfer function
+    of the distortion system
+    """
+
+    key = hash_array(h, "spectrum", tuple(shape))
+    h_dft = spectrum_cache.get(key)
+    if h_dft is None:
+        h_dft = spectrum_cache.put(key, wiener_filtering.get_kernel_spectrum(h, shape))
+
+    return h_dft
+
+
+def cached_wiener_filter(y: np.ndarray, h: np.ndarray, k: float):
+    """
+    Cached version of wiener_filtering.my_wiener_filter
+
+    :param y: 2-dimensional array representing the distorted grayscale image in the spatial
+            field
+    :param h: 2-dimensional array representing the impulse response of the
+            distortion system
+    :param k: Wiener filter parameter
+    :return: 2-dimensional image (read-only) of shape identical to the input image y, output
+    of the Wiener filter in the spatial field
+    """
+
+    # the key of the output depends on both the image and the impulse response
+    key = hash_array(y, "wiener", hash_array(h), float(k))
+    x_hat = output_cache.get(key)
+    if x_hat is None:
+        h_dft = cached_kernel_spectrum(h, y.shape[-2:])
+        x_hat = output_cache.put(key, wiener_filtering.my_wiener_filter(y, h, k, h_dft=h_dft))
+
+    return x_hat
@@ -1,26 +1,20 @@
 import numpy as np
 
 
-def my_wiener_filter(y: np.ndarray, h: np.ndarray, k: float):
+def get_kernel_spectrum(h: np.ndarray, shape: tuple):
     """
-    Returns an estimation of an original 2-dimensional signal x, that has been distorted
-    based on the model:
-    y = h*x + v,
-    where v is a 2-dimensional noise signal and h is the impulse response of the distortion
-    system.
-    The estimation is performed using Wiener Filtering.
+    Returns the Discrete Fourier Transform of the impulse response h of the distortion
+    system, zero-padded to the given image shape.
 
-    :param y: 2-dimensional array representing the distorted grayscale image in the spatial
-            field
     :param h: 2-dimensional array representing the impulse response of the
             distortion system
-    :param k: Wiener filter parameter
-    :return: 2-dimensional image of shape identical to the input image y, output of the Wiener
-    filter in the spatial field
+    :param shape: shape (m, n) of the image the distortion system is applied on
+    :return: 2-dimensional complex array of shape <shape>, transfer function of the
+    distortion system
     """
 
-    # shape of input image y
-    m, n = y.shape
+    # shape of the image
+    m, n = shape
     # shape of impulse response h
     l, p = h.shape
 
@@ -28,10 +22,19 @@ def my_wiener_filter(y: np.ndarray, h: np.ndarray, k: float):
     h_padded = np.zeros((m, n))
     h_padded[:l, :p] = h
 
-    # perform Discrete Fourier Transform on the padded versions of the input image y and
-    # the impulse response h, using the Fast Fourier Transform
-    y_dft = np.fft.fft2(y)
-    h_dft = np.fft.fft2(h_padded)
+    return np.fft.fft2(h_padded)
+
+
+def get_wiener_transfer_function(h_dft: np.ndarray, k):
+    """
+    Returns the transfer function of the Wiener filter for a distortion system with
+    transfer function h_dft.
+
+    :param h_dft: 2-dimensional complex array, transfer function of the distortion system
+    :param k: Wiener filter parameter (float), or array of parameters shaped to broadcast
+            against h_dft, e.g. k[:, None, None] for one transfer function per value of k
+    :return: complex array, transfer function of the Wiener filter
+    """
 
     # compute conjugate of distortion system transfer function
     h_dft_conj = np.conjugate(h_dft)
@@ -40,7 +43,41 @@ def my_wiener_filter(y: np.ndarray, h: np.ndarray, k: float):
     h_dft_magn2 = np.absolute(h_dft)**2
 
     # compute the transfer function of the Wiener filter
-    wiener_filter = np.divide(h_dft_conj, (h_dft_magn2 + 1/k))
+    return np.divide(h_dft_conj, (h_dft_magn2 + 1/k))
+
+
+def my_wiener_filter(y: np.ndarray, h: np.ndarray, k: float, h_dft: np.ndarray = None):
+    """
+    Returns an estimation of an original 2-dimensional signal x, that has been distorted
+    based on the model:
+    y = h*x + v,
+    where v is a 2-dimensional noise signal and h is the impulse response of the distortion
+    system.
+    The estimation is performed using Wiener Filtering.
+
+    :param y: 2-dimensional array representing the distorted grayscale image in the spatial
+            field, or 3-dimensional array of such images stacked along the first axis,
+            which are all filtered at once
+    :param h: 2-dimensional array representing the impulse response of the
+            distortion system
+    :param k: Wiener filter parameter
+    :param h_dft: precomputed Discrete Fourier Transform of the impulse response h,
+            zero-padded to the shape of an image of y (as returned by get_kernel_spectrum);
+            computed if not given
+    :return: image (or stack of images) of shape identical to the input y, output of the Wiener
+    filter in the spatial field
+    """
+
+    # perform Discrete Fourier Transform on the input image y and the padded version of
+    # the impulse response h, using the Fast Fourier Transform
+    # (the transform is computed over the last two axes, so stacked images are
+    # transformed independently and share the same transfer function)
+    y_dft = np.fft.fft2(y)
+    if h_dft is None:
+        h_dft = get_kernel_spectrum(h, y.shape[-2:])
+
+    # compute the transfer function of the Wiener filter
+    wiener_filter = get_wiener_transfer_function(h_dft, k)
 
     # output of wiener filtering in the spatial frequency field
     x_hat_dft = np.multiply(wiener_filter, y_dft)